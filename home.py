@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+import numpy as np
+import io
+import logging
 
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
+from concurrent.futures import ThreadPoolExecutor
+
+# seaborn, matplotlib, scipy and scikit-learn are imported lazily by the
+# pages that plot or fit models, so text-only pages skip loading them
 
 # =========================================================
 # PAGE CONFIG
@@ -18,12 +21,230 @@ st.set_page_config(
 # =========================================================
 # LOAD DATA
 # =========================================================
-@st.cache_data
+# Columns used by the charts and the clustering model; the rest of the
+# CSV is only read for the Dataset page
+USED_COLUMNS = [
+    "Make",
+    "Model_Year",
+    "Electric_Range",
+    "City",
+    "State",
+    "Base_MSRP",
+    "Electric_Vehicle_Type",
+]
+
+@st.cache_resource
 def load_data():
-    return pd.read_csv("EV_Cleaned.csv")
+    df = pd.read_csv(
+        "EV_Cleaned.csv",
+        engine="pyarrow",
+        usecols=USED_COLUMNS,
+        dtype={
+            "Make": "category",
+            "City": "category",
+            "State": "category",
+            "Electric_Vehicle_Type": "category",
+            "Model_Year": "int16",
+        }
+    )
+    # Range and price are written as whole-number floats ("220.0"),
+    # so they are downcast after parsing
+    df["Electric_Range"] = df["Electric_Range"].astype("int16")
+    df["Base_MSRP"] = df["Base_MSRP"].astype("int32")
+    return df
+
+@st.cache_resource
+def load_full_data():
+    return pd.read_csv("EV_Cleaned.csv", engine="pyarrow")
+
+@st.cache_data
+def column_count():
+    # The pyarrow engine does not support nrows, so read the header with
+    # the default parser
+    return len(pd.read_csv("EV_Cleaned.csv", nrows=0).columns)
 
 df = load_data()
 
+# =========================================================
+# CACHED AGGREGATES
+# =========================================================
+def top_k(series, k=15):
+    # Count the category codes and partially select the k largest instead
+    # of sorting every category as value_counts().head(k) does
+    cats = series.cat.categories
+    codes = series.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(cats))
+    k = min(k, len(cats))
+    idx = np.argpartition(-counts, k - 1)[:k]
+    idx = idx[np.argsort(-counts[idx], kind="stable")]
+    return pd.Series(counts[idx], index=cats[idx], name="count")
+
+@st.cache_data(hash_funcs={pd.DataFrame: id}, show_spinner=False)
+def top_makes(df):
+    return top_k(df["Make"])
+
+@st.cache_data(hash_funcs={pd.DataFrame: id}, show_spinner=False)
+def year_counts(df):
+    # Model_Year spans a few dozen years, so count with a direct bincount
+    years = df["Model_Year"].to_numpy()
+    lo = years.min()
+    counts = np.bincount(years - lo)
+    return np.arange(lo, lo + len(counts)), counts
+
+@st.cache_data(hash_funcs={pd.DataFrame: id}, show_spinner=False)
+def range_hist(df):
+    return np.histogram(df["Electric_Range"].to_numpy(), bins=40)
+
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def range_kde(df):
+    from scipy.stats import gaussian_kde
+
+    # A 10k-row sample is plenty for a smooth density curve
+    sample = df["Electric_Range"].sample(
+        min(len(df), 10_000), random_state=0
+    ).to_numpy()
+    grid = np.linspace(sample.min(), sample.max(), 200)
+    return grid, gaussian_kde(sample)(grid)
+
+@st.cache_data(hash_funcs={pd.DataFrame: id}, show_spinner=False)
+def top_cities(df):
+    return top_k(df["City"])
+
+@st.cache_data(hash_funcs={pd.DataFrame: id}, show_spinner=False)
+def type_counts(df):
+    return df["Electric_Vehicle_Type"].value_counts()
+
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def null_summary(df):
+    return df.isnull().sum()
+
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def msrp_features(df):
+    mask = df["Base_MSRP"].to_numpy() > 0
+    return df.loc[mask, ["Electric_Range", "Base_MSRP"]].astype(np.float32)
+
+# =========================================================
+# CACHED MODELS
+# =========================================================
+@st.cache_resource
+def fit_kmeans(features):
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    scaled_features = scaler.fit_transform(features)
+
+    kmeans = MiniBatchKMeans(
+        n_clusters=3, random_state=42, batch_size=1024, n_init=3
+    )
+    labels = kmeans.fit_predict(scaled_features)
+    return scaler, kmeans, labels
+
+@st.cache_data
+def scatter_sample(labels, per_cluster=2000):
+    # Row positions of at most per_cluster random points from each cluster
+    shuffled = pd.Series(labels).sample(frac=1, random_state=0)
+    return shuffled.groupby(shuffled).head(per_cluster).index.to_numpy()
+
+# =========================================================
+# CACHED CHARTS
+# =========================================================
+# Charts are cached as rendered PNG bytes rather than as shared Figure
+# objects: savefig temporarily changes a figure's dpi and size, so
+# concurrent sessions rendering one cached Figure would corrupt it.
+# Figures are built with matplotlib.figure.Figure, which is not tracked
+# by pyplot's global (non-thread-safe) figure manager.
+def render_png(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
+    return buf.getvalue()
+
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def chart_top_makes(df):
+    from matplotlib.figure import Figure
+
+    makes = top_makes(df)
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    # barh draws bottom-up, so reverse to keep the largest make on top
+    ax.barh(makes.index[::-1], makes.values[::-1])
+    ax.set_title("Top 15 EV Manufacturers")
+    return render_png(fig)
+
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def chart_year_trend(df):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+    ax.plot(*year_counts(df), marker="o")
+    ax.set_title("EV Adoption Trend Over Years")
+    return render_png(fig)
+
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def chart_range_hist(df):
+    from matplotlib.figure import Figure
+
+    counts, edges = range_hist(df)
+    grid, density = range_kde(df)
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge")
+    # Scale the density to histogram counts, as histplot(kde=True) does
+    ax.plot(grid, density * counts.sum() * np.diff(edges)[0])
+    ax.set_xlabel("Electric_Range")
+    ax.set_ylabel("Count")
+    ax.set_title("Electric Range Distribution")
+    return render_png(fig)
+
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def chart_top_cities(df):
+    from matplotlib.figure import Figure
+
+    cities = top_cities(df)
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.barh(cities.index[::-1], cities.values[::-1])
+    ax.set_title("Top 15 Cities with EV Adoption")
+    return render_png(fig)
+
+@st.cache_data(hash_funcs={pd.DataFrame: id})
+def chart_type_counts(df):
+    from matplotlib.figure import Figure
+
+    types = type_counts(df)
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    ax.bar(types.index.astype(str), types.values)
+    ax.set_title("EV Type Distribution (BEV vs PHEV)")
+    return render_png(fig)
+
+# =========================================================
+# CACHE WARM-UP
+# =========================================================
+@st.cache_resource(hash_funcs={pd.DataFrame: id})
+def warm_caches(df):
+    # Runs once per process: fill the independent EDA aggregates in the
+    # background so the first visitor does not pay for them one by one.
+    # pandas/NumPy release the GIL in these scans, so threads overlap.
+    # range_kde is left out so scipy is still only imported on demand.
+    # The warmed helpers use show_spinner=False: pool threads have no
+    # ScriptRunContext, and drawing a spinner there logs a warning.
+    # This is the only place the script logs; warm-up runs off the page,
+    # so a failure cannot be shown with st.error.
+    def log_failure(future):
+        if future.exception() is not None:
+            logging.getLogger(__name__).error(
+                "Cache warm-up task failed", exc_info=future.exception()
+            )
+
+    executor = ThreadPoolExecutor(max_workers=4)
+    for fn in (top_makes, top_cities, year_counts, type_counts, range_hist):
+        executor.submit(fn, df).add_done_callback(log_failure)
+    executor.shutdown(wait=False)
+
+warm_caches(df)
+
 # =========================================================
 # SIDEBAR
 # =========================================================
@@ -59,7 +280,7 @@ if page == "Overview":
     col1, col2, col3 = st.columns(3)
 
     col1.metric("Total Records", f"{df.shape[0]:,}")
-    col2.metric("Total Features", df.shape[1])
+    col2.metric("Total Features", column_count())
     col3.metric("Unique EV Makes", df["Make"].nunique())
 
     st.success("✅ Dashboard loaded successfully")
@@ -70,18 +291,20 @@ if page == "Overview":
 elif page == "Dataset":
     st.title("📁 Dataset Overview")
 
+    full_df = load_full_data()
+
     st.subheader("Preview of Dataset")
-    st.dataframe(df.head())
+    st.table(full_df.head())
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Dataset Shape")
-        st.write(df.shape)
+        st.write(full_df.shape)
 
     with col2:
         st.subheader("Missing Values")
-        st.write(df.isnull().sum())
+        st.write(null_summary(full_df))
 
 # =========================================================
 # EDA PAGE
@@ -101,47 +324,31 @@ elif page == "Exploratory Data Analysis":
     )
 
     if chart == "Top EV Manufacturers":
-        top_makes = df["Make"].value_counts().head(15)
-        fig, ax = plt.subplots(figsize=(10, 5))
-        sns.barplot(x=top_makes.values, y=top_makes.index, ax=ax)
-        ax.set_title("Top 15 EV Manufacturers")
-        st.pyplot(fig)
+        st.image(chart_top_makes(df))
 
     elif chart == "EV Adoption by Model Year":
-        year_counts = df.groupby("Model_Year").size()
-        fig, ax = plt.subplots(figsize=(10, 4))
-        sns.lineplot(x=year_counts.index, y=year_counts.values, marker="o", ax=ax)
-        ax.set_title("EV Adoption Trend Over Years")
-        st.pyplot(fig)
+        st.image(chart_year_trend(df))
 
     elif chart == "Electric Range Distribution":
-        fig, ax = plt.subplots(figsize=(10, 4))
-        sns.histplot(df["Electric_Range"], bins=40, kde=True, ax=ax)
-        ax.set_title("Electric Range Distribution")
-        st.pyplot(fig)
+        st.image(chart_range_hist(df))
 
     elif chart == "Top Cities by EV Count":
-        top_cities = df["City"].value_counts().head(15)
-        fig, ax = plt.subplots(figsize=(10, 5))
-        sns.barplot(x=top_cities.values, y=top_cities.index, ax=ax)
-        ax.set_title("Top 15 Cities with EV Adoption")
-        st.pyplot(fig)
+        st.image(chart_top_cities(df))
 
     
 
     
 
     elif chart == "EV Type Distribution":
-        type_counts = df["Electric_Vehicle_Type"].value_counts()
-        fig, ax = plt.subplots(figsize=(6, 4))
-        sns.barplot(x=type_counts.index, y=type_counts.values, ax=ax)
-        ax.set_title("EV Type Distribution (BEV vs PHEV)")
-        st.pyplot(fig)
+        st.image(chart_type_counts(df))
 
 # =========================================================
 # CLUSTERING PAGE
 # =========================================================
 elif page == "EV Clustering (ML)":
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
     st.title("🤖 EV Market Segmentation using K-Means")
 
     st.markdown("""
@@ -153,18 +360,28 @@ elif page == "EV Clustering (ML)":
     - Only EVs with **valid price information** are considered.
     """)
 
-    clean_df = df[df["Base_MSRP"] > 0].copy()
-    features = clean_df[["Electric_Range", "Base_MSRP"]]
+    # cache_data hands back a fresh copy, so adding "Cluster" is safe
+    clean_df = msrp_features(df)
+    features = clean_df.to_numpy()
 
-    scaler = StandardScaler()
-    scaled_features = scaler.fit_transform(features)
+    scaler, kmeans, labels = fit_kmeans(features)
+    clean_df["Cluster"] = labels
+
+    # Draw at most 2000 random points per cluster; the averages below
+    # still use every row
+    plot_df = clean_df.iloc[scatter_sample(labels)]
 
-    kmeans = KMeans(n_clusters=3, random_state=42)
-    clean_df["Cluster"] = kmeans.fit_predict(scaled_features)
+    # Reuse one figure per session instead of allocating a new one on
+    # every rerun; the EDA charts are cached as PNG images. A bare
+    # Figure is not registered with pyplot, so it is freed with the session
+    if "cluster_fig" not in st.session_state:
+        st.session_state.cluster_fig = Figure(figsize=(8, 5))
+        st.session_state.cluster_ax = st.session_state.cluster_fig.subplots()
+    fig, ax = st.session_state.cluster_fig, st.session_state.cluster_ax
+    ax.clear()
 
-    fig, ax = plt.subplots(figsize=(8, 5))
     sns.scatterplot(
-        data=clean_df,
+        data=plot_df,
         x="Electric_Range",
         y="Base_MSRP",
         hue="Cluster",